@@ -1,10 +1,20 @@
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Records are handed to a queue and written to the console by a background
+# thread, so request handlers never block on formatting or stderr writes
+log_queue = queue.Queue(-1)
+listener = QueueListener(log_queue, logging.StreamHandler())  # Logs to the console
+listener.start()
+atexit.register(listener.stop)
 
 logging.basicConfig(
     level=logging.INFO,  # Set logging level to INFO
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",  # Log format
     handlers=[
-        logging.StreamHandler()  # Logs to the console
+        QueueHandler(log_queue)
     ]
 )
 
@@ -1,25 +1,39 @@
-from typing import Union
+from typing import Any, Union
 import json
 import os
 import re
+import shutil
+import stat
+import tempfile
 import asyncio
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import orjson
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, File, Form, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from pydantic import BaseModel
 from project_setup import *
 from logger import logger
-import playwright
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
-origins = [
+# A set makes the per-request origin check a hash lookup
+origins = frozenset({
     "https://exp-chat.nikhil.com.np",
     "http://localhost",
     "http://localhost:8080",
     "https://exp-lobechat.nikhil.com.np",
     "http://localhost:3010"
-]
+})
+
+_SCREENSHOTS_DIR = "screenshots"
+_FILE_IO_WORKERS = 64
+_SKIP_DIRNAMES = frozenset({'node_modules'})
+_SKIP_RELPATH_PREFIXES = ('src/components/ui',)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +43,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# File operations are offloaded with asyncio.to_thread, so give the default
+# executor more threads than asyncio's min(32, cpu_count + 4)
+@app.on_event("startup")
+async def _set_executor():
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=_FILE_IO_WORKERS))
+
+@app.on_event("startup")
+async def _make_screenshots_dir():
+    os.makedirs(_SCREENSHOTS_DIR, exist_ok=True)
+
+# A single browser is shared by all screenshot requests; each request only
+# opens its own context, which is far cheaper than launching Chromium. It is
+# launched on the first screenshot so the rest of the API works without it.
+_browser_lock = asyncio.Lock()
+
+async def _get_browser():
+    async with _browser_lock:
+        browser = getattr(app.state, "browser", None)
+        if browser is not None and browser.is_connected():
+            return browser
+        # Never launched, or Chromium crashed/disconnected: start afresh
+        app.state.browser = None
+        old_pw = getattr(app.state, "pw", None)
+        if old_pw is not None:
+            app.state.pw = None
+            try:
+                await old_pw.stop()
+            except Exception as e:
+                logger.error(f"Error stopping Playwright: {str(e)}")
+        pw = await async_playwright().start()
+        try:
+            browser = await pw.chromium.launch(headless=True)
+        except Exception:
+            await pw.stop()
+            raise
+        app.state.pw = pw
+        app.state.browser = browser
+        return browser
+
+@app.on_event("shutdown")
+async def _pw_stop():
+    browser = getattr(app.state, "browser", None)
+    if browser is not None:
+        await browser.close()
+    pw = getattr(app.state, "pw", None)
+    if pw is not None:
+        await pw.stop()
+
 # Define Pydantic models for request body
 class FileContent(BaseModel):
     content: str
@@ -55,25 +117,113 @@ class ProjectDetails(BaseModel):
 class ProjectName(BaseModel):
     project_name: str
 
+_MANIFEST_FILENAME = "lobechat-manifest.json"
+_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), _MANIFEST_FILENAME)
+_MANIFEST_BYTES = None
+
+def _read_text_sync(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+# Directories the server has already created or confirmed, so repeated writes
+# into the same directory skip the makedirs stat/mkdir calls
+_known_dirs: set[str] = set()
+
+def _ensure_parent_sync(path):
+    parent = os.path.dirname(path)
+    if parent not in _known_dirs:
+        os.makedirs(parent, exist_ok=True)
+        _known_dirs.add(parent)
+
+def _open_with_parents_sync(path, mode, **kwargs):
+    _ensure_parent_sync(path)
+    try:
+        return open(path, mode, **kwargs)
+    except FileNotFoundError:
+        # The cached parent was removed outside of the server; recreate it
+        _known_dirs.discard(os.path.dirname(path))
+        _ensure_parent_sync(path)
+        return open(path, mode, **kwargs)
+
+def _write_text_sync(path, data, make_parents=False):
+    if make_parents:
+        file = _open_with_parents_sync(path, "w", encoding="utf-8")
+    else:
+        file = open(path, "w", encoding="utf-8")
+    with file:
+        file.write(data)
+
+# File I/O is run in a worker thread so it doesn't block the event loop
+async def _read_text(path):
+    return await asyncio.to_thread(_read_text_sync, path)
+
+async def _write_text(path, data, make_parents=False):
+    await asyncio.to_thread(_write_text_sync, path, data, make_parents)
+
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def _copy_upload_sync(src, path):
+    with _open_with_parents_sync(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, _UPLOAD_CHUNK_SIZE)
+
+# get_project_directory already checks that the project is a directory, so a
+# single stat of the target file is all the endpoints below need
+def _project_dir_or_404(project_name):
+    project_dir = get_abs_project_directory(project_name)
+    if project_dir is None:
+        raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found.")
+    return project_dir
+
+def _safe_join(project_dir: str, rel: str) -> str:
+    """
+    Joins a client-supplied path onto the (already resolved) project directory,
+    rejecting anything that resolves outside of it. The joined path is returned
+    unresolved so that symlinks are acted on themselves, not their targets.
+    """
+    target = os.path.normpath(os.path.join(project_dir, rel))
+    if os.path.commonpath([os.path.realpath(target), project_dir]) != project_dir:
+        raise HTTPException(status_code=403, detail="Access outside the project directory is forbidden.")
+    return target
+
+async def _stat_file(project_name, filepath):
+    file_path = _safe_join(_project_dir_or_404(project_name), filepath)
+    try:
+        st = await asyncio.to_thread(os.stat, file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"File '{filepath}' not found.")
+    if not stat.S_ISREG(st.st_mode):
+        raise HTTPException(status_code=400, detail=f"'{filepath}' is not a file.")
+    return file_path, st
+
+async def _resolve_project(details: ProjectDetails) -> str:
+    return _project_dir_or_404(details.project_name)
+
+async def _resolve(details: ProjectDetails) -> tuple[str, os.stat_result]:
+    return await _stat_file(details.project_name, details.filepath)
+
+async def _resolve_query(project_name: str, filepath: str) -> tuple[str, os.stat_result]:
+    return await _stat_file(project_name, filepath)
+
 @app.get("/manifest")
 async def read_manifest():
-    file_name = "lobechat-manifest.json"
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, file_name)
-    
-    if not os.path.isfile(file_path):
-        raise HTTPException(status_code=404, detail=f"File '{file_name}' not found.")
-    
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            content = json.load(file)
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=400, detail=f"JSON decode error: {str(e)}")
-    except Exception as e:
-        logger.error(f"Error reading manifest: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    return content
+    global _MANIFEST_BYTES
+
+    # The manifest does not change at runtime, so it is read, parsed and
+    # serialized only once; later requests just send the cached bytes
+    if _MANIFEST_BYTES is None:
+        if not os.path.isfile(_MANIFEST_PATH):
+            raise HTTPException(status_code=404, detail=f"File '{_MANIFEST_FILENAME}' not found.")
+
+        try:
+            with open(_MANIFEST_PATH, "r", encoding="utf-8") as file:
+                _MANIFEST_BYTES = orjson.dumps(json.load(file))
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"JSON decode error: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error reading manifest: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return Response(_MANIFEST_BYTES, media_type="application/json")
     
 @app.post("/create_react_project")
 async def create_react_project(details: ProjectName):
@@ -84,97 +234,114 @@ async def create_react_project(details: ProjectName):
         logger.error(f"Error creating project: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
 
+# Content is sent as a JSON string, so the whole file is held in memory several
+# times over; files larger than about 1 MB should go through /upload_file instead
 @app.post("/create_or_replace_file")
-async def create_file(details: ProjectDetails, file_content: FileContent):
-    project_dir = get_project_directory(details.project_name)
-    logger.info(f"Project path: {project_dir}")
-
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{details.project_name}' not found.")
+async def create_file(details: ProjectDetails, file_content: FileContent, project_dir: str = Depends(_resolve_project)):
+    logger.debug(f"Project path: {project_dir}")
 
-    file_path = os.path.join(project_dir, details.filepath)
+    file_path = _safe_join(project_dir, details.filepath)
 
     try:
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(file_content.content)
+        await _write_text(file_path, file_content.content, make_parents=True)
         return {"success": True, "message": f"File '{details.filepath}' created/replaced successfully."}
     except Exception as e:
         logger.error(f"Error creating/replacing file: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/delete_file")
-async def delete_file(details: ProjectDetails):
-    project_dir = get_project_directory(details.project_name)
+@app.post("/upload_file")
+async def upload_file(project_name: str = Form(...), filepath: str = Form(...), file: UploadFile = File(...)):
+    file_path = _safe_join(_project_dir_or_404(project_name), filepath)
 
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{details.project_name}' not found.")
+    try:
+        # The multipart body is already spooled by Starlette; copy it to the
+        # target in fixed-size chunks without decoding it
+        await asyncio.to_thread(_copy_upload_sync, file.file, file_path)
+        return {"success": True, "message": f"File '{filepath}' uploaded successfully."}
+    except Exception as e:
+        logger.error(f"Error uploading file: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await file.close()
 
-    file_path = os.path.join(project_dir, details.filepath)
+@app.post("/delete_file")
+async def delete_file(details: ProjectDetails, resolved: tuple[str, os.stat_result] = Depends(_resolve)):
+    file_path, _ = resolved
 
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-            return {"success": True, "message": f"File '{details.filepath}' deleted successfully."}
-        except Exception as e:
-            logger.error(f"Error deleting file: {str(e)}")
-            raise HTTPException(status_code=500, detail=str(e))
-    else:
-        raise HTTPException(status_code=404, detail=f"File '{details.filepath}' not found.")
+    try:
+        await asyncio.to_thread(os.remove, file_path)
+        return {"success": True, "message": f"File '{details.filepath}' deleted successfully."}
+    except Exception as e:
+        logger.error(f"Error deleting file: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/get_file")
-async def get_file(details: ProjectDetails):
-    project_dir = get_project_directory(details.project_name)
+async def get_file(details: ProjectDetails, raw: bool = False, resolved: tuple[str, os.stat_result] = Depends(_resolve)):
+    file_path, st = resolved
 
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{details.project_name}' not found.")
+    # Raw mode streams the file straight from disk instead of wrapping it in JSON
+    if raw:
+        return FileResponse(file_path, media_type="text/plain; charset=utf-8", stat_result=st)
+    try:
+        content = await _read_text(file_path)
+        return {"success": True, "content": content}
+    except Exception as e:
+        logger.error(f"Error reading file: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-    file_path = os.path.join(project_dir, details.filepath)
+def _is_under(rel_path, prefixes):
+    return any(rel_path == prefix or rel_path.startswith(prefix + '/') for prefix in prefixes)
 
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-            return {"success": True, "content": content}
-        except Exception as e:
-            logger.error(f"Error reading file: {str(e)}")
-            raise HTTPException(status_code=500, detail=str(e))
-    else:
-        raise HTTPException(status_code=404, detail=f"File '{details.filepath}' not found.")
+def _iter_files(root, rel_prefix, skip_rel_prefixes, skip_dirnames):
+    """
+    Lists files below root, pruning skipped directories before descending into them.
+
+    Args:
+        root (str): Absolute path of the directory to walk.
+        rel_prefix (str): Path of root relative to the project, with a trailing '/' (or '' for the project root).
+        skip_rel_prefixes (tuple): Project-relative directories whose contents are not listed.
+        skip_dirnames (set): Directory names that are never descended into.
+    """
+    file_list = []
+    if rel_prefix and _is_under(rel_prefix[:-1], skip_rel_prefixes):
+        return file_list
+
+    pending = deque([(root, rel_prefix)])
+    while pending:
+        abs_path, prefix = pending.pop()
+        with os.scandir(abs_path) as it:
+            for entry in it:
+                rel_path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in skip_dirnames or _is_under(rel_path, skip_rel_prefixes):
+                        continue
+                    pending.append((entry.path, rel_path + '/'))
+                elif entry.is_symlink() and entry.is_dir():
+                    # Like os.walk, links to directories are neither followed nor listed
+                    continue
+                else:
+                    file_list.append(rel_path)
+    return file_list
 
 @app.post("/list_files")
 async def list_files(details: ProjectDetails):
-    project_dir = get_project_directory(details.project_name)
-    logger.info(f"Project path {project_dir}")
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{details.project_name}' not found.")
-    
-    directory_path = os.path.join(project_dir, details.filepath) if details.filepath else project_dir
-    logger.info(f"Directory path {directory_path}")
+    abs_project_dir = _project_dir_or_404(details.project_name)
+    logger.debug(f"Project path {abs_project_dir}")
     
-    abs_directory_path = os.path.abspath(directory_path)
-    if not abs_directory_path.startswith(os.path.abspath(project_dir)):
-        raise HTTPException(status_code=403, detail="Access outside the project directory is forbidden.")
+    abs_directory_path = _safe_join(abs_project_dir, details.filepath) if details.filepath else abs_project_dir
     
-    logger.info(f"Directory path: {abs_directory_path}")
+    logger.debug(f"Directory path: {abs_directory_path}")
     
-    if not os.path.isdir(abs_directory_path):
+    if not await asyncio.to_thread(os.path.isdir, abs_directory_path):
         raise HTTPException(status_code=404, detail=f"Directory '{details.filepath}' not found.")
     
-    file_list = []
     try:
-        for root, dirs, files in os.walk(abs_directory_path):
-            if 'node_modules' in dirs:
-                dirs.remove('node_modules')
-            
-            relative_root = os.path.relpath(root, project_dir)
-            if relative_root.startswith('src/components/ui'):
-                continue
-            
-            for file in files:
-                relative_path = os.path.relpath(os.path.join(root, file), project_dir)
-                file_list.append(relative_path)
-                
+        relative_root = os.path.relpath(abs_directory_path, abs_project_dir)
+        rel_prefix = '' if relative_root == '.' else relative_root.replace(os.sep, '/') + '/'
+        file_list = await asyncio.to_thread(
+            _iter_files, abs_directory_path, rel_prefix, _SKIP_RELPATH_PREFIXES, _SKIP_DIRNAMES
+        )
+
         if not file_list:
             return {"success": True, "message": f"No files found in the directory '{details.filepath}'."}
         
@@ -183,31 +350,112 @@ async def list_files(details: ProjectDetails):
         logger.error(f"Error listing files: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/edit_file_regex")
-async def edit_file_regex(details: ProjectDetails, regex_edit: RegexEdit):
-    project_dir = get_project_directory(details.project_name)
-
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{details.project_name}' not found.")
-
-    file_path = os.path.join(project_dir, details.filepath)
+@lru_cache(maxsize=512)
+def _compiled(pattern: str):
+    return re.compile(pattern)
+
+# Files at least this large are edited in newline-aligned chunks when the edit
+# can't span lines, instead of holding the old and new content in memory at once
+_STREAM_EDIT_MIN_BYTES = 32 * 1024 * 1024
+_STREAM_CHUNK_CHARS = 1024 * 1024
+
+# Anything that could match or look past a newline, or that anchors to the
+# start/end of the whole file: control characters, ^ and $, escapes other than
+# \d \w \S \b (digit escapes are octal inside [...]), and inline DOTALL flags
+_LINE_UNSAFE_REGEX = re.compile(r"[\x00-\x1f^$]|\\[^dwSb\W]|\(\?[aiLmux-]*s")
+
+def _is_line_safe(pattern):
+    return not pattern.flags & re.DOTALL and _LINE_UNSAFE_REGEX.search(pattern.pattern) is None
+
+def _str_subn(search, replace):
+    def subn(segment, count):
+        n = segment.count(search)
+        return segment.replace(search, replace, count or -1), min(n, count) if count else n
+    return subn
+
+def _iter_segments(src, chunk_chars):
+    """
+    Yields (segment, has_newline) pieces of a text file, each made of whole lines
+    with the newline that ends the piece split off. A file ending in a newline
+    yields a final empty segment, as str.split("\n") would.
+    """
+    parts = []
+    while block := src.read(chunk_chars):
+        cut = block.rfind("\n")
+        if cut < 0:
+            parts.append(block)
+            continue
+        parts.append(block[:cut])
+        yield "".join(parts), True
+        parts = [block[cut + 1:]]
+    yield "".join(parts), False
+
+def _stream_sub_sync(path, search, subn, count, chunk_chars=_STREAM_CHUNK_CHARS):
+    """
+    Applies a substitution to a file in newline-aligned chunks, writing the
+    result to a sibling temp file that replaces the original. The file is
+    scanned first, so nothing is written when there is no match.
+
+    Args:
+        path (str): File to edit.
+        search (callable): Called as search(segment); returns whether the segment contains a match.
+        subn (callable): Called as subn(segment, count); returns (new_segment, substitutions).
+        count (int): Maximum number of substitutions, or 0 for all of them.
+        chunk_chars (int): Approximate number of characters read per chunk.
+
+    Returns:
+        int: Number of substitutions made.
+    """
+    with open(path, "r", encoding="utf-8") as src:
+        if not any(search(segment) for segment, _ in _iter_segments(src, chunk_chars)):
+            return 0
+
+    replaced = 0
+    tmp = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(path), delete=False)
+    try:
+        with open(path, "r", encoding="utf-8") as src, tmp:
+            for segment, has_newline in _iter_segments(src, chunk_chars):
+                if not count or replaced < count:
+                    segment, n = subn(segment, count - replaced if count else 0)
+                    replaced += n
+                tmp.write(segment)
+                if has_newline:
+                    tmp.write("\n")
+        shutil.copymode(path, tmp.name)
+        os.replace(tmp.name, path)
+    except BaseException:
+        if os.path.exists(tmp.name):
+            os.unlink(tmp.name)
+        raise
+    return replaced
 
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail=f"File '{details.filepath}' not found.")
+@app.post("/edit_file_regex")
+async def edit_file_regex(details: ProjectDetails, regex_edit: RegexEdit, resolved: tuple[str, os.stat_result] = Depends(_resolve)):
+    file_path, st = resolved
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-
-        pattern = re.compile(regex_edit.regex)
+        pattern = _compiled(regex_edit.regex)
+
+        if st.st_size >= _STREAM_EDIT_MIN_BYTES and _is_line_safe(pattern):
+            subn = lambda segment, count: pattern.subn(regex_edit.content, segment, count=count)
+            replaced = await asyncio.to_thread(
+                _stream_sub_sync, file_path, pattern.search, subn, 0 if regex_edit.multiple else 1
+            )
+            if not replaced:
+                return {"success": True, "message": f"Pattern not found in '{details.filepath}', file left unchanged."}
+            return {"success": True, "message": f"File '{details.filepath}' updated successfully."}
+
+        content = await _read_text(file_path)
+        
+        if pattern.search(content) is None:
+            return {"success": True, "message": f"Pattern not found in '{details.filepath}', file left unchanged."}
         
         if regex_edit.multiple:
-            new_content = re.sub(pattern, regex_edit.content, content)
+            new_content = pattern.sub(regex_edit.content, content)
         else:
-            new_content = re.sub(pattern, regex_edit.content, content, count=1)
+            new_content = pattern.sub(regex_edit.content, content, count=1)
 
-        with open(file_path, 'w', encoding='utf-8') as file:
-            file.write(new_content)
+        await _write_text(file_path, new_content)
 
         return {"success": True, "message": f"File '{details.filepath}' updated successfully."}
     except re.error as e:
@@ -217,96 +465,120 @@ async def edit_file_regex(details: ProjectDetails, regex_edit: RegexEdit):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/search_replace_file")
-async def search_replace_file(project_name: str, filepath: str, search_replace: SearchReplace):
-    project_dir = get_project_directory(project_name)
-
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found.")
-
-    file_path = os.path.join(project_dir, filepath)
-
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail=f"File '{filepath}' not found.")
+async def search_replace_file(project_name: str, filepath: str, search_replace: SearchReplace, resolved: tuple[str, os.stat_result] = Depends(_resolve_query)):
+    file_path, st = resolved
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
+        if st.st_size >= _STREAM_EDIT_MIN_BYTES and "\n" not in search_replace.search:
+            subn = _str_subn(search_replace.search, search_replace.replace)
+            search = lambda segment: search_replace.search in segment
+            replaced = await asyncio.to_thread(
+                _stream_sub_sync, file_path, search, subn, 0 if search_replace.multiple else 1
+            )
+            if not replaced:
+                return {"success": True, "message": f"Search string not found in '{filepath}', file left unchanged."}
+            return {"success": True, "message": f"File '{filepath}' updated successfully."}
+
+        content = await _read_text(file_path)
+        
+        if search_replace.search not in content:
+            return {"success": True, "message": f"Search string not found in '{filepath}', file left unchanged."}
         
         if search_replace.multiple:
             new_content = content.replace(search_replace.search, search_replace.replace)
         else:
             new_content = content.replace(search_replace.search, search_replace.replace, 1)
 
-        with open(file_path, 'w', encoding='utf-8') as file:
-            file.write(new_content)
+        await _write_text(file_path, new_content)
 
         return {"success": True, "message": f"File '{filepath}' updated successfully."}
     except Exception as e:
         logger.error(f"Error searching and replacing in file: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# npm rewrites package.json/package-lock.json on install/uninstall, so those
+# are serialized per project while different projects can still run in parallel.
+# Locks are keyed by the project's realpath (from _project_dir_or_404) so every
+# alias of a project shares one lock.
+_project_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+_NPM_SEARCH_TTL = 60
+_NPM_SEARCH_CACHE_SIZE = 256
+_npm_search_cache: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+def _cached_npm_search(package_name):
+    cached = _npm_search_cache.get(package_name)
+    if cached is None:
+        return None
+    if time.monotonic() - cached[0] >= _NPM_SEARCH_TTL:
+        del _npm_search_cache[package_name]
+        return None
+    _npm_search_cache.move_to_end(package_name)
+    return cached[1]
+
+def _store_npm_search(package_name, results):
+    _npm_search_cache[package_name] = (time.monotonic(), results)
+    _npm_search_cache.move_to_end(package_name)
+    while len(_npm_search_cache) > _NPM_SEARCH_CACHE_SIZE:
+        _npm_search_cache.popitem(last=False)
+
 @app.post("/install_npm_package")
 async def install_npm_package(project_name: str, npm_package: NpmPackage):
-    project_dir = get_project_directory(project_name)
-
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found.")
+    project_dir = _project_dir_or_404(project_name)
     
-    command = f"npm install {npm_package.package_name}" if npm_package.version is None else f"npm install {npm_package.package_name}@{npm_package.version}"
+    package_spec = npm_package.package_name if npm_package.version is None else f"{npm_package.package_name}@{npm_package.version}"
     
     try:
-        process = await asyncio.create_subprocess_shell(
-            command,
-            cwd=project_dir,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
+        async with _project_locks[project_dir]:
+            process = await asyncio.create_subprocess_exec(
+                "npm", "install", package_spec,
+                cwd=project_dir,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
         
         if process.returncode == 0:
             return {"success": True, "message": f"Package '{npm_package.package_name}' installed successfully."}
         else:
-            error_message = "STDOUT:\n" + stdout.decode() + "\nSTDERR::\n" + stderr.decode()
-            raise HTTPException(status_code=500, detail=f"Error installing package: {error_message}")
+            raise HTTPException(status_code=500, detail=f"Error installing package: {stderr.decode()}")
     except Exception as e:
         logger.error(f"Error installing npm package: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/remove_npm_package")
 async def remove_npm_package(project_name: str, package_name: str):
-    project_dir = get_project_directory(project_name)
-
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found.")
+    project_dir = _project_dir_or_404(project_name)
     
     try:
-        process = await asyncio.create_subprocess_shell(
-            f"npm uninstall {package_name}",
-            cwd=project_dir,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
+        async with _project_locks[project_dir]:
+            process = await asyncio.create_subprocess_exec(
+                "npm", "uninstall", package_name,
+                cwd=project_dir,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
         
         if process.returncode == 0:
             return {"success": True, "message": f"Package '{package_name}' removed successfully."}
         else:
-            error_message = "STDOUT:\n" + stdout.decode() + "\nSTDERR::\n" + stderr.decode()
-            raise HTTPException(status_code=500, detail=f"Error removing package: {error_message}")
+            raise HTTPException(status_code=500, detail=f"Error removing package: {stderr.decode()}")
     except Exception as e:
         logger.error(f"Error removing npm package: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/search_npm_package")
 async def search_npm_package(project_name, package_name: str):
-    project_dir = get_project_directory(project_name)
+    project_dir = _project_dir_or_404(project_name)
     
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found.")
+    cached = _cached_npm_search(package_name)
+    if cached is not None:
+        return {"success": True, "results": cached}
     
     try:
-        process = await asyncio.create_subprocess_shell(
-            f"npm search {package_name} --json",
+        process = await asyncio.create_subprocess_exec(
+            "npm", "search", package_name, "--json",
             cwd=project_dir,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
@@ -315,6 +587,7 @@ async def search_npm_package(project_name, package_name: str):
         
         if process.returncode == 0:
             search_results = json.loads(stdout.decode())
+            _store_npm_search(package_name, search_results)
             return {"success": True, "results": search_results}
         else:
             error_message = stderr.decode() if stderr else stdout.decode()
@@ -323,26 +596,37 @@ async def search_npm_package(project_name, package_name: str):
         logger.error(f"Error searching npm package: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+_BUILD_LOG_TAIL_BYTES = 8 * 1024
+
+def _read_tail_sync(file, size):
+    file.seek(0, os.SEEK_END)
+    file.seek(max(file.tell() - size, 0))
+    return file.read().decode("utf-8", errors="replace")
+
 @app.post("/build")
 async def build(project_name: str):
-    project_dir = get_project_directory(project_name)
-
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found.")
+    project_dir = _project_dir_or_404(project_name)
 
     try:
-        process = await asyncio.create_subprocess_shell(
-            "npm run build",
-            cwd=project_dir,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
+        # The build log can be large, so it goes to an anonymous temp file (removed
+        # on close) and only its tail is returned
+        log_file = await asyncio.to_thread(tempfile.TemporaryFile)
+        with log_file:
+            # Builds of one project share its dist/ output, so they are serialized too
+            async with _project_locks[project_dir]:
+                process = await asyncio.create_subprocess_exec(
+                    "npm", "run", "build",
+                    cwd=project_dir,
+                    stdout=log_file,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr = await process.communicate()
+            output = await asyncio.to_thread(_read_tail_sync, log_file, _BUILD_LOG_TAIL_BYTES)
         
         if process.returncode == 0:
-            return {"success": True, "output": stdout.decode()}
+            return {"success": True, "output": output}
         else:
-            error_message = "STDOUT:\n" + stdout.decode() + "\nSTDERR::\n" + stderr.decode()
+            error_message = "STDOUT:\n" + output + "\nSTDERR::\n" + stderr.decode()
             raise HTTPException(status_code=process.returncode, detail=f"Error during build: {error_message}")
     except Exception as e:
         logger.error(f"Error building project: {str(e)}")
@@ -350,14 +634,11 @@ async def build(project_name: str):
 
 @app.post("/lint")
 async def lint(project_name: str):
-    project_dir = get_project_directory(project_name)
-
-    if not os.path.exists(project_dir):
-        raise HTTPException(status_code=404, detail=f"Project '{project_name}' not found.")
+    project_dir = _project_dir_or_404(project_name)
 
     try:
-        process = await asyncio.create_subprocess_shell(
-            "npm run lint",
+        process = await asyncio.create_subprocess_exec(
+            "npm", "run", "lint",
             cwd=project_dir,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
@@ -367,7 +648,6 @@ async def lint(project_name: str):
         if process.returncode == 0:
             return {"success": True, "output": stdout.decode()}
         else:
-            error_message = "STDOUT:\n" + stdout.decode() + "\nSTDERR::\n" + stderr.decode()
             return {"success": False, "output": stderr.decode()}
     except Exception as e:
         logger.error(f"Error linting project: {str(e)}")
@@ -377,17 +657,18 @@ async def lint(project_name: str):
 async def screenshot(url: str = "/", background_tasks: BackgroundTasks = BackgroundTasks()):
     async def take_screenshot(url: str):
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
+            browser = await _get_browser()
+            ctx = await browser.new_context()
+            try:
+                page = await ctx.new_page()
                 await page.goto(url)
-                screenshot_path = os.path.join("screenshots", f"screenshot_{int(time.time())}.png")
-                os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
+                screenshot_path = os.path.join(_SCREENSHOTS_DIR, f"screenshot_{int(time.time())}.png")
                 await page.screenshot(path=screenshot_path)
-                await browser.close()
-                logger.info(f"Screenshot taken and saved to '{screenshot_path}'.")
-                return screenshot_path
-        except playwright.errors.TimeoutError:
+            finally:
+                await ctx.close()
+            logger.info(f"Screenshot taken and saved to '{screenshot_path}'.")
+            return screenshot_path
+        except PlaywrightTimeoutError:
             logger.error(f"Timeout error while taking screenshot of {url}")
             raise HTTPException(status_code=504, detail="Timeout while loading the page")
         except Exception as e:
@@ -399,5 +680,7 @@ async def screenshot(url: str = "/", background_tasks: BackgroundTasks = Backgro
 
 if __name__ == "__main__":
     import uvicorn
+    # uvicorn's default loop="auto"/http="auto" already picks uvloop and httptools
+    # when they're installed (they come with fastapi[standard] on Linux/macOS)
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
@@ -1,12 +1,44 @@
 import os
+import shutil
 import zipfile
 import tarfile
 import asyncio
+from collections import OrderedDict
+from functools import wraps
 from logger import logger
 
 script_path = os.path.dirname(os.path.abspath(__file__))
 projects_directory = "projects"
 
+def _cache_hits(maxsize=256):
+    """
+    Memoizes a project lookup in an LRU of maxsize entries, keeping only results
+    that aren't None so a project that doesn't exist yet is looked up again on
+    the next call.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+
+        @wraps(func)
+        def wrapper(project_name):
+            result = cache.get(project_name)
+            if result is not None:
+                cache.move_to_end(project_name)
+                return result
+            result = func(project_name)
+            if result is not None:
+                cache[project_name] = result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+# Project locations don't move while the server is running (and uvicorn keeps a
+# stable cwd), so found projects are memoized; create_project clears the cache.
+@_cache_hits(maxsize=256)
 def get_project_directory(project_name):
     # First, check if it's an absolute path
     if os.path.isabs(project_name):
@@ -25,6 +57,11 @@ def get_project_directory(project_name):
     # If not found, return None
     return None
 
+@_cache_hits(maxsize=256)
+def get_abs_project_directory(project_name):
+    project_dir = get_project_directory(project_name)
+    return os.path.realpath(project_dir) if project_dir else None
+
 async def create_project(project_name):
     destination_folder = os.path.join(script_path, projects_directory, project_name)
     logger.info(f"Destination folder of new project {destination_folder}")
@@ -33,6 +70,8 @@ async def create_project(project_name):
         os.makedirs(destination_folder, exist_ok=True)
     
     await deflate_file("project.tar.gz", destination_folder)
+    get_project_directory.cache_clear()
+    get_abs_project_directory.cache_clear()
 
 async def deflate_file(file_path, destination_folder):
     """
@@ -59,12 +98,57 @@ async def deflate_file(file_path, destination_folder):
     else:
         logger.error("Unsupported file format. Only .zip and .tar.gz are supported.")
 
+_COPY_BUFFER_SIZE = 64 * 1024
+
+def _safe_target(root, member_name):
+    """
+    Resolves where an archive member should be written, rejecting members that
+    would land outside the (already resolved) destination folder (zip/tar slip).
+    """
+    target = os.path.realpath(os.path.join(root, member_name))
+    if os.path.commonpath([root, target]) != root:
+        logger.error(f"Skipping archive member outside destination: {member_name}")
+        return None
+    return target
+
+def _copy_member(src, target, mode=None):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as dst:
+        shutil.copyfileobj(src, dst, _COPY_BUFFER_SIZE)
+    if mode:
+        os.chmod(target, mode)
+
 def extract_zip(file_path, destination_folder):
+    root = os.path.realpath(destination_folder)
     with zipfile.ZipFile(file_path, 'r') as zip_ref:
-        zip_ref.extractall(destination_folder)
+        for info in zip_ref.infolist():
+            target = _safe_target(root, info.filename)
+            if target is None:
+                continue
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+                continue
+            with zip_ref.open(info) as src:
+                _copy_member(src, target, (info.external_attr >> 16) & 0o777)
 
 def extract_tar(file_path, destination_folder):
+    root = os.path.realpath(destination_folder)
     with tarfile.open(file_path, 'r:gz') as tar_ref:
-        tar_ref.extractall(destination_folder)
-        
-
+        for member in tar_ref:
+            target = _safe_target(root, member.name)
+            if target is None:
+                continue
+            if member.isdir():
+                os.makedirs(target, exist_ok=True)
+            elif member.isfile():
+                with tar_ref.extractfile(member) as src:
+                    _copy_member(src, target, member.mode & 0o777)
+            elif member.issym() or member.islnk():
+                # Symlinks are relative to the link's own directory, hardlinks
+                # to the archive root; either way the target must stay inside
+                link_base = os.path.dirname(member.name) if member.issym() else ""
+                if _safe_target(root, os.path.join(link_base, member.linkname)) is None:
+                    continue
+                tar_ref.extract(member, root)
+            else:
+                logger.error(f"Skipping unsupported archive member: {member.name}")
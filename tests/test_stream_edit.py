@@ -0,0 +1,104 @@
+import os
+import random
+import re
+
+import pytest
+
+from main import _is_line_safe, _str_subn, _stream_sub_sync
+
+ATOMS = [
+    "a", "b", ".", "x*", "a+", "a?", " ", "\\d", "\\w", "\\S", "\\b", "\\B", "\\D", "\\W", "\\s", "\\n",
+    "(a|b)", "[ab]", "[^a]", "[\\12]", "[\\1-\\177]", "(a)\\1", "(?=a)", "(?!b)", "(?<=a)", "(?<!b)",
+    "^", "$", "\\Z", "(?i)A", "(?s).", "(?s:.)",
+]
+REPLACEMENTS = ["-", "", "\\g<0>\\g<0>", "X\nY"]
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write(text)
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        return file.read()
+
+
+def _random_text(rnd, alphabet, max_len=40):
+    return "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, max_len)))
+
+
+@pytest.mark.parametrize("pattern", ["[\\12]", "[\\1-\\177]+", "(a)\\1", "\\s", "[^a]", "^a", "a$", "(?s).", "(?is:.)", "a\nb"])
+def test_unsafe_patterns_are_rejected(pattern):
+    assert not _is_line_safe(re.compile(pattern))
+
+
+@pytest.mark.parametrize("pattern", ["a+", "f(o)o", "\\w+\\.tsx", "\\bimport\\b", "(?i)react", "(?<=a)b"])
+def test_safe_patterns_are_accepted(pattern):
+    assert _is_line_safe(re.compile(pattern))
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 7, 1024])
+def test_streamed_regex_matches_one_shot(tmp_path, chunk_chars):
+    path = tmp_path / "f.txt"
+    rnd = random.Random(chunk_chars)
+    checked = 0
+    while checked < 2000:
+        pattern = "".join(rnd.choice(ATOMS) for _ in range(rnd.randint(1, 3)))
+        try:
+            compiled = re.compile(pattern)
+        except re.error:
+            continue
+        if not _is_line_safe(compiled):
+            continue
+        text = _random_text(rnd, "ab \n1_")
+        repl = rnd.choice(REPLACEMENTS)
+        count = rnd.choice([0, 1])
+        _write(path, text)
+
+        replaced = _stream_sub_sync(
+            str(path), compiled.search, lambda s, n: compiled.subn(repl, s, count=n), count, chunk_chars
+        )
+
+        assert _read(path) == compiled.sub(repl, text, count=count), (pattern, text, repl, count)
+        assert bool(replaced) == (compiled.search(text) is not None)
+        checked += 1
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 7, 1024])
+def test_streamed_replace_matches_one_shot(tmp_path, chunk_chars):
+    path = tmp_path / "f.txt"
+    rnd = random.Random(chunk_chars)
+    for _ in range(2000):
+        search = _random_text(rnd, "ab ", 2)
+        replace = rnd.choice(["", "-", "x\ny"])
+        text = _random_text(rnd, "ab \n")
+        count = rnd.choice([0, 1])
+        _write(path, text)
+
+        replaced = _stream_sub_sync(str(path), lambda s: search in s, _str_subn(search, replace), count, chunk_chars)
+
+        assert _read(path) == text.replace(search, replace, count or -1), (search, text, replace, count)
+        assert bool(replaced) == (search in text)
+
+
+def test_no_match_leaves_file_untouched(tmp_path):
+    path = tmp_path / "f.txt"
+    _write(path, "foo\nbar\n")
+    mtime = os.stat(path).st_mtime_ns
+    pattern = re.compile("zzz")
+
+    assert _stream_sub_sync(str(path), pattern.search, lambda s, n: pattern.subn("q", s, count=n), 0) == 0
+    assert os.listdir(tmp_path) == ["f.txt"]
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_replacement_keeps_file_mode(tmp_path):
+    path = tmp_path / "f.txt"
+    _write(path, "foo\nbar\n")
+    os.chmod(path, 0o640)
+
+    assert _stream_sub_sync(str(path), lambda s: "bar" in s, _str_subn("bar", "baz"), 0) == 1
+    assert _read(path) == "foo\nbaz\n"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["f.txt"]